@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 class CommonCoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'dolphin_v3'
\ No newline at end of file
+    name = 'dolphin_v3'
+
+    def ready(self):
+        # Connect the permission cache invalidation signal handlers, also for
+        # shells, management commands and workers that never load the URLconf
+        from dolphin_v3.users import permissions  # noqa: F401
@@ -1,5 +1,63 @@
 import secrets
-from django.contrib.auth.hashers import make_password, check_password
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    check_password,
+    get_hashers,
+    get_hashers_by_algorithm,
+    make_password,
+)
+
+# Argon2id first, the remaining hashers only verify (and upgrade) legacy hashes
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+def configure_hashers(hashers=None):
+    '''
+    Makes Argon2id the default password hasher, keeping PBKDF2 for legacy verification.
+    Django re-hashes a legacy password with Argon2 on the next successful login.
+    Prefer setting PASSWORD_HASHERS in settings.py; this is for projects that can't.
+    '''
+    settings.PASSWORD_HASHERS = list(hashers or PASSWORD_HASHERS)
+    get_hashers.cache_clear()
+    get_hashers_by_algorithm.cache_clear()
+
+def benchmark_hash(target_ms=50, max_time_cost=10):
+    '''
+    Measures Argon2 verification on this machine and returns the highest
+    time_cost whose verify time stays within target_ms (at least 1), using the
+    memory_cost / parallelism of Django's Argon2PasswordHasher.
+    :return: dict(time_cost, memory_cost, parallelism, elapsed_ms)
+    '''
+    import argon2
+
+    memory_cost = Argon2PasswordHasher.memory_cost
+    parallelism = Argon2PasswordHasher.parallelism
+    result = None
+    for time_cost in range(1, max_time_cost + 1):
+        hasher = argon2.PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        hashed = hasher.hash("benchmark-password")
+        start = time.perf_counter()
+        hasher.verify(hashed, "benchmark-password")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if result is not None and elapsed_ms > target_ms:
+            break
+        result = {
+            "time_cost": time_cost,
+            "memory_cost": memory_cost,
+            "parallelism": parallelism,
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+    return result
 
 def hash_password(raw_password):
     return make_password(raw_password)
@@ -7,5 +65,9 @@ def hash_password(raw_password):
 def verify_password(raw_password, hashed):
     return check_password(raw_password, hashed)
 
-def generate_token(length=32):
-    return secrets.token_hex(length // 2)  # Each byte is represented by two hex digits
\ No newline at end of file
+def generate_token(nbytes=16):
+    return secrets.token_hex(nbytes)  # Each byte is represented by two hex digits
+
+def generate_id():
+    # Non-secret unique id (correlation / idempotency keys), not for auth tokens
+    return uuid.uuid4().hex
\ No newline at end of file
@@ -1,17 +1,39 @@
+COMPRESSORS = {
+    "lz4": "django_redis.compressors.lz4.Lz4Compressor",
+    "zstd": "django_redis.compressors.zstd.ZStdCompressor",
+    "zlib": "django_redis.compressors.zlib.ZlibCompressor",
+    "none": "django_redis.compressors.identity.IdentityCompressor",
+}
+
+
 def get_redis_cache_config(
     host="127.0.0.1",
     port=6379,
     db=0,
     password=None,
     timeout=300,
+    compressor="zlib",
+    max_connections=50,
 ):
     """
     Returns a Redis-backed Django CACHES config.
     
     Your Django project can simply do:
-                from common_core.cache.backends import get_redis_cache_config
+                from dolphin_v3.cache.backends import get_redis_cache_config
                 CACHES = get_redis_cache_config(host="my-redis-host", db=10)
+
+    compressor: one of "zlib" (default), "lz4", "zstd" or "none".
+                "lz4" needs the `lz4` package, "zstd" needs `pyzstd`.
+                Entries written with another compressor can't be read back,
+                so when switching on an existing Redis either flush the db or
+                set a new KEY_PREFIX / VERSION in the returned config.
+    Redis errors are ignored by the cache API (treated as cache misses)
+    instead of failing the request.
     """
+    if compressor not in COMPRESSORS:
+        raise ValueError(
+            f"Invalid compressor: {compressor}. Valid compressors are: {list(COMPRESSORS)}"
+        )
 
     location = f"redis://{password + '@' if password else ''}{host}:{port}/{db}"
 
@@ -23,9 +45,14 @@ def get_redis_cache_config(
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
                 "SERIALIZER": "django_redis.serializers.json.JSONSerializer",
-                "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+                "COMPRESSOR": COMPRESSORS[compressor],
                 "SOCKET_CONNECT_TIMEOUT": 2,  # Prevent hanging
                 "SOCKET_TIMEOUT": 2,
+                "IGNORE_EXCEPTIONS": True,
+                "CONNECTION_POOL_KWARGS": {
+                    "max_connections": max_connections,
+                    "health_check_interval": 30,
+                },
             }
         }
-    }
\ No newline at end of file
+    }
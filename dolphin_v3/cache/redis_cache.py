@@ -1,16 +1,24 @@
+import asyncio
+
+import redis.asyncio as aioredis
+from django.conf import settings
 from django_redis import get_redis_connection
 
 class RedisClient:
     """
     Wrapper over django_redis connection with common helpers.
-    from common_core.cache.redis_cache import redis_client
+    from dolphin_v3.cache.redis_cache import get_redis_client
+            redis_client = get_redis_client()
             redis_client.set("count", 10)
             value = redis_client.get("count")
+
+    No connection is held by the wrapper, every call takes one from the
+    django_redis connection pool of the alias.
     """
 
     def __init__(self, alias="default"):
         self.alias = alias
-        
+
     @property
     def conn(self):
         return get_redis_connection(self.alias)
@@ -36,11 +44,107 @@ class RedisClient:
     def ping(self):
         return self.conn.ping()
 
+    def mget(self, keys):
+        return self.conn.mget(keys)
+
+    def mset(self, mapping, ttl=None):
+        """
+        Sets all keys in one round trip, with an optional ttl applied to each key.
+        """
+        if ttl is None:
+            return self.conn.mset(mapping)
+        with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ttl)
+            return pipe.execute()
 
-redis_client = None
+    def pipeline(self, transaction=True):
+        """
+        Batch several commands into one round trip:
+            with redis_client.pipeline() as pipe:
+                pipe.set("a", 1)
+                pipe.incr("b")
+                pipe.execute()
+        """
+        return self.conn.pipeline(transaction=transaction)
+
+
+_redis_clients = {}
 
 def get_redis_client(alias="default"):
-    global redis_client
-    if redis_client is None:
-        redis_client = RedisClient(alias)
-    return redis_client
\ No newline at end of file
+    client = _redis_clients.get(alias)
+    if client is None:
+        client = _redis_clients.setdefault(alias, RedisClient(alias))
+    return client
+
+
+class AsyncRedisClient:
+    """
+    asyncio counterpart of RedisClient for async views, backed by a shared connection pool.
+    Independent reads can be overlapped with asyncio.gather or batched with mget / pipeline:
+            redis_client = get_async_redis_client()
+            values = await redis_client.mget(["a", "b", "c"])
+            async with redis_client.pipeline() as pipe:
+                pipe.set("a", 1)
+                pipe.incr("b")
+                await pipe.execute()
+
+    ASGI only: the pool's connections belong to the event loop that opened
+    them, so the client must always run on the same long-lived loop. Async
+    views under WSGI (async_to_sync, a new loop per call) should use the sync
+    RedisClient instead.
+    """
+
+    def __init__(self, url, max_connections=50):
+        self._pool = aioredis.ConnectionPool.from_url(url, max_connections=max_connections)
+        self._loop = None
+
+    @property
+    def conn(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif loop is not self._loop:
+            raise RuntimeError(
+                "AsyncRedisClient is bound to another event loop, it needs a single "
+                "long-lived loop (ASGI). Use RedisClient under WSGI."
+            )
+        return aioredis.Redis(connection_pool=self._pool)
+
+    async def set(self, key, value, ttl=None):
+        await self.conn.set(key, value, ex=ttl)
+
+    async def get(self, key):
+        return await self.conn.get(key)
+
+    async def delete(self, key):
+        return await self.conn.delete(key)
+
+    async def mget(self, keys):
+        return await self.conn.mget(keys)
+
+    async def mset(self, mapping, ttl=None):
+        if ttl is None:
+            return await self.conn.mset(mapping)
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ttl)
+            return await pipe.execute()
+
+    def pipeline(self, transaction=True):
+        return self.conn.pipeline(transaction=transaction)
+
+
+_async_redis_clients = {}
+
+def get_async_redis_client(alias="default"):
+    """
+    Returns the AsyncRedisClient for a CACHES alias, using its LOCATION url.
+    """
+    client = _async_redis_clients.get(alias)
+    if client is None:
+        location = settings.CACHES[alias]["LOCATION"]
+        if isinstance(location, (list, tuple)):
+            location = location[0]
+        client = _async_redis_clients.setdefault(alias, AsyncRedisClient(location))
+    return client
\ No newline at end of file
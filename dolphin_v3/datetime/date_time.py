@@ -1,43 +1,101 @@
-import calendar
 import datetime
-from datetime import date, time, timedelta
+from datetime import date, time
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import pytz
 
 
+@lru_cache(maxsize=512)
+def _get_tz(name: str):
+    '''
+    Returns a cached timezone object for the given name.
+    Uses zoneinfo and falls back to pytz only for names zoneinfo cannot resolve.
+    '''
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        # OSError: tzdata directory names such as "America"
+        pass
+    try:
+        return pytz.timezone(name)
+    except pytz.exceptions.UnknownTimeZoneError:
+        raise ValueError(f"Invalid timezone: {name}")
+
+
+def _localize(date_time: datetime, tz_obj) -> datetime:
+    '''
+    Attaches tz_obj to a naive datetime.
+    For zoneinfo, ambiguous/non-existent wall times resolve with fold=0
+    (the earlier offset), unlike pytz.localize which defaults to is_dst=False.
+    '''
+    if hasattr(tz_obj, "localize"):  # pytz fallback
+        return tz_obj.localize(date_time)
+    return date_time.replace(tzinfo=tz_obj)
+
+
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _last_day_of_month(year: int, month: int) -> int:
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _MONTH_DAYS[month - 1]
+
+
 def get_first_and_last_date_of_month(year: int, month: int) -> tuple:
     '''Returns the first and last date of a given month and year.'''
 
-    first, last = calendar.monthrange(year, month)
-    return datetime.date(year, month, 1), datetime.date(year, month, last)
+    first = datetime.date(year, month, 1)
+    return first, first.replace(day=_last_day_of_month(year, month))
+
+
+def iter_month_bounds(start_year: int, end_year: int):
+    '''Yields (first, last) dates of every month from start_year to end_year inclusive.'''
+    for year in range(start_year, end_year + 1):
+        for month in range(1, 13):
+            first = datetime.date(year, month, 1)
+            yield first, first.replace(day=_last_day_of_month(year, month))
 
 
 def get_date_range(start_date: date, end_date: date) -> list[date]:
     '''Generates a list of dates between start_date and end_date inclusive.'''
-    return [
-        start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)
-    ]
+    return list(map(date.fromordinal, range(start_date.toordinal(), end_date.toordinal() + 1)))
 
 
 def format_to_date(date_string: str) -> date:
     ''' Formats a string to a date object. Expects format 'YYYY-MM-DD'. '''
+    if len(date_string) == 10 and date_string[4] == "-" and date_string[7] == "-":
+        try:
+            return date.fromisoformat(date_string)
+        except ValueError:
+            pass
+    # Anything else (e.g. '2024-1-2') keeps strptime's behaviour and errors
     return datetime.datetime.strptime(date_string, "%Y-%m-%d").date()
 
 
 def format_to_time(time_string: str) -> time:
     ''' Formats a string to a time object. Expects format 'HH:MM'. '''
+    if (
+        len(time_string) == 5
+        and time_string[2] == ":"
+        and time_string[:2].isdigit()
+        and time_string[3:].isdigit()
+    ):
+        try:
+            return time(int(time_string[:2]), int(time_string[3:]))
+        except ValueError:
+            pass
+    # Anything else (e.g. '9:05') keeps strptime's behaviour and errors
     return datetime.datetime.strptime(time_string, "%H:%M").time()
 
 
 def make_timezone_aware(date_time: datetime, tz: str = "UTC") -> datetime:
     '''Makes a naive datetime object timezone aware.'''
-    try:
-        tz_obj = pytz.timezone(tz)
-    except pytz.exceptions.UnknownTimeZoneError:
-        raise ValueError(f"Invalid timezone: {tz}")
+    tz_obj = _get_tz(tz)
 
     if date_time.tzinfo is None:
-        date_time_obj = tz_obj.localize(date_time)
+        date_time_obj = _localize(date_time, tz_obj)
     else:
         date_time_obj = date_time.astimezone(tz_obj)
 
@@ -50,13 +108,10 @@ def timezone_conversion(
     
     '''Converts a datetime object from one timezone to another.'''
     
-    try:
-        local_tz = pytz.timezone(from_tz)
-        to_convert_tz = pytz.timezone(to_tz)
-    except pytz.exceptions.UnknownTimeZoneError:
-        raise ValueError(f"Invalid timezone: {from_tz}")
+    local_tz = _get_tz(from_tz)
+    to_convert_tz = _get_tz(to_tz)
     local_datetime = (
-        local_tz.localize(date_time)
+        _localize(date_time, local_tz)
         if date_time.tzinfo is None or date_time.tzinfo.utcoffset(date_time) is None
         else date_time
     )
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.backends.utils import names_digest
 from django.utils.timezone import now
 
 from django.conf import settings
@@ -6,27 +7,28 @@ from django.conf import settings
 
 class BaseModel(models.Model):
     '''
-    Base model to set custom db_table naming convention
+    Base model for the db_table naming convention
     db_table = "<app_label>_<model_name>(lowercase)"
+    This is Django's default db_table (including truncation to the backend's
+    name length limit), so no metaclass or override is needed and BaseModel
+    can be mixed with other ModelBase subclasses (MPTT, polymorphic, ...).
+    An explicit db_table in the model's Meta is left untouched.
     '''
     class Meta:
         abstract = True
 
-    def __init_subclass__(cls, **kwargs):
-        super().__init_subclass__(**kwargs)
-        if not cls._meta.abstract:
-            app_label = cls._meta.app_label  # Get the app label (alias)
-            cls._meta.db_table = f"{app_label}_{cls.__name__.lower()}"
-
 
 class SoftDeleteQuerySet(models.QuerySet):
     '''
     Custom QuerySet to handle soft delete operations
-    .delete() - soft delete
+    .delete(user=None) - soft delete
     .hard_delete() - permanent delete
     '''
-    def delete(self):
-        return super().update(is_deleted=True, deleted_at=now())
+    def delete(self, user=None):
+        values = {"is_deleted": True, "deleted_at": now()}
+        if user:
+            values["deleted_by"] = user
+        return super().update(**values)
 
     def hard_delete(self):
         return super().delete()
@@ -38,6 +40,32 @@ class SoftDeleteQuerySet(models.QuerySet):
         return self.filter(is_deleted=True)
 
 
+def soft_delete_partial_index(model, columns=("id",), name=None):
+    '''
+    Returns a partial index on `columns` that only covers alive rows (is_deleted=False),
+    so queries through SoftDeleteManager don't scan deleted rows and the index stays small.
+    :model: model class or "app_label.model_name" (the class isn't available inside
+            its own Meta). The app label keeps default names unique across apps.
+    Usage:
+        class Invoice(SoftDeleteModelMixin):
+            class Meta:
+                indexes = [
+                    soft_delete_partial_index("billing.invoice"),
+                    soft_delete_partial_index("billing.invoice", ["patient"]),
+                ]
+    '''
+    columns = list(columns)
+    if name is None:
+        label = model.lower() if isinstance(model, str) else model._meta.label_lower
+        app_label, _, model_name = label.rpartition(".")
+        if not app_label:
+            raise ValueError(f"Expected 'app_label.model_name', got {model!r}")
+        # Index names are limited to 30 characters
+        digest = names_digest(app_label, model_name, *columns, length=8)
+        name = f"{model_name[:15]}_{digest}_alive"
+    return models.Index(fields=columns, condition=models.Q(is_deleted=False), name=name)
+
+
 class SoftDeleteManager(models.Manager):
     '''
     Custom manager to use SoftDeleteQuerySet
@@ -114,18 +142,28 @@ class SoftDeleteModelMixin(BaseModel):
         abstract = True
 
     def delete(self, user=None):
-        self.is_deleted = True
-        self.deleted_at = now()
-        if hasattr(self, "deleted_by") and user:
-            self.deleted_by = user
-        self.save()
+        values = {"is_deleted": True, "deleted_at": now()}
+        if user:
+            values["deleted_by"] = user
+        self._update_columns(values)
 
     def hard_delete(self):
         super().delete()
     
     def restore(self, user=None):
-        self.is_deleted = False
-        self.restored_at = now()
-        if hasattr(self, "restored_by") and user:
-            self.restored_by = user
-        self.save()
\ No newline at end of file
+        values = {"is_deleted": False, "restored_at": now()}
+        if user:
+            values["restored_by"] = user
+        self._update_columns(values)
+
+    def _update_columns(self, values):
+        '''
+        Writes only the given columns (plus auto_now fields) with a single UPDATE,
+        without save() signals, and mirrors them on the instance.
+        '''
+        for field in self._meta.concrete_fields:
+            if getattr(field, "auto_now", False):
+                values[field.attname] = field.pre_save(self, add=False)
+        type(self)._base_manager.filter(pk=self.pk).update(**values)
+        for name, value in values.items():
+            setattr(self, name, value)
\ No newline at end of file
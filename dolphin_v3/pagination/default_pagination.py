@@ -1,6 +1,14 @@
-from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
+import base64
+import datetime
+import decimal
+import json
+import uuid
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, LimitOffsetPagination
 from rest_framework.response import Response
 from django.conf import settings
+from django.db.models import Q
 
 class CustomDefaultPagination(PageNumberPagination):
     """
@@ -10,20 +18,53 @@ class CustomDefaultPagination(PageNumberPagination):
     page_size_query_param = "per_page"
     page_size = getattr(settings, 'DEFAULT_PAGE_SIZE', 10)
     max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 100)
+    # COUNT(*) is only issued when the client asks for it with ?with_count=1
+    count_query_param = "with_count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # ?page=last needs the total, so it always goes through the counting path
+        self.with_count = (
+            request.query_params.get(self.count_query_param) in ("1", "true")
+            or request.query_params.get(self.page_query_param) in self.last_page_strings
+        )
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        self.per_page = self.get_page_size(request)
+        if not self.per_page:
+            return None
+        try:
+            self.current_page = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if self.current_page < 1:
+            raise NotFound(self.invalid_page_message)
+
+        # Fetch one extra row to know whether a next page exists without counting
+        offset = (self.current_page - 1) * self.per_page
+        rows = list(queryset[offset : offset + self.per_page + 1])
+        self.has_next = len(rows) > self.per_page
+        return rows[: self.per_page]
 
-    
     def get_paginated_response(self, data):
-        return Response(
-            {
-                "meta": {
-                    "total": self.page.paginator.count,
-                    "last_page": self.page.paginator.num_pages,
-                    "current_page": self.page.number,
-                    "per_page": self.page.paginator.per_page,
-                },
-                "data": data,
+        if self.with_count:
+            meta = {
+                "total": self.page.paginator.count,
+                "last_page": self.page.paginator.num_pages,
+                "current_page": self.page.number,
+                "per_page": self.page.paginator.per_page,
+                "has_next": self.page.has_next(),
             }
-        )
+        else:
+            meta = {
+                "total": None,
+                "last_page": None,
+                "current_page": self.current_page,
+                "per_page": self.per_page,
+                "has_next": self.has_next,
+            }
+        return Response({"meta": meta, "data": data})
 
 
 class CustomLimitOffsetPagination(LimitOffsetPagination):
@@ -40,4 +81,141 @@ class CustomLimitOffsetPagination(LimitOffsetPagination):
                 "count": self.count,
                 "data": data,
             }
-        )
\ No newline at end of file
+        )
+
+
+# Cursor values that JSON can't carry exactly are stored as [tag, str(value)]
+# (full precision, e.g. datetime microseconds) and parsed back on decode.
+_CURSOR_TYPES = (
+    ("dt", datetime.datetime, datetime.datetime.fromisoformat),
+    ("d", datetime.date, datetime.date.fromisoformat),
+    ("t", datetime.time, datetime.time.fromisoformat),
+    ("dec", decimal.Decimal, decimal.Decimal),
+    ("uuid", uuid.UUID, uuid.UUID),
+)
+_CURSOR_PARSERS = {tag: parse for tag, _, parse in _CURSOR_TYPES}
+
+
+def _encode_cursor_value(value):
+    for tag, value_type, _ in _CURSOR_TYPES:
+        if isinstance(value, value_type):
+            return [tag, value.isoformat() if hasattr(value, "isoformat") else str(value)]
+    return value
+
+
+def _decode_cursor_value(value):
+    if isinstance(value, list):
+        tag, raw = value
+        return _CURSOR_PARSERS[tag](raw)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a strictly ordered set of columns.
+    Pages are addressed by an opaque `cursor` query param instead of an offset,
+    so the database seeks straight to the page through the index and no
+    COUNT(*) is issued.
+
+    `ordering` columns must be plain, non-null model fields and the last one
+    must be unique (e.g. ("-created_at", "-id")).
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "per_page"
+    page_size = getattr(settings, 'DEFAULT_PAGE_SIZE', 10)
+    max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 100)
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.per_page = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+
+        ordering = [self._flip(order) for order in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, cursor["values"]))
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "meta": {
+                    "next_cursor": self.get_next_cursor(),
+                    "prev_cursor": self.get_previous_cursor(),
+                    "per_page": self.per_page,
+                },
+                "data": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_cursor(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        values = [getattr(row, order.lstrip("-")) for order in self.ordering]
+        payload = json.dumps({"v": [_encode_cursor_value(value) for value in values], "r": reverse})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values, reverse = payload["v"], bool(payload["r"])
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            values = [_decode_cursor_value(value) for value in values]
+        except (TypeError, ValueError, KeyError, decimal.InvalidOperation):
+            raise NotFound(self.invalid_cursor_message)
+        return {"values": values, "reverse": reverse}
+
+    @staticmethod
+    def _flip(order):
+        return order[1:] if order.startswith("-") else f"-{order}"
+
+    @staticmethod
+    def _seek_filter(ordering, values):
+        '''
+        Row-value comparison (c1, c2, ...) after (v1, v2, ...) in the given ordering:
+        c1 > v1 OR (c1 = v1 AND c2 > v2) OR ...
+        '''
+        condition = Q()
+        equal = {}
+        for order, value in zip(ordering, values):
+            field = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        return condition
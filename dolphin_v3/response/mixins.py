@@ -1,14 +1,150 @@
 
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, MultipleObjectsReturned, ObjectDoesNotExist
 import django.db
 from django.http import Http404
 
 from rest_framework import serializers, status
 import rest_framework.exceptions
 from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.relations import RelatedField
 from rest_framework.response import Response
 
-from dolphin_v3.users.permissions import PermissionUtils
+from dolphin_v3.users.permissions import get_request_permission_utils, resolve_view_model
+
+
+def _detail(error):
+    return error.detail
+
+
+def _missing_key(error):
+    return f"Missing key: {error}"
+
+
+# (exception class, default message, status code, errors getter)
+# Checked in order with isinstance, so subclasses must come before their bases.
+EXCEPTION_TABLE = (
+    (ValidationError, "Validation Error", status.HTTP_400_BAD_REQUEST, _detail),
+    (serializers.ValidationError, "Validation Error", status.HTTP_400_BAD_REQUEST, _detail),
+    (PermissionDenied, "Permission Denied", status.HTTP_403_FORBIDDEN, None),
+    (ObjectDoesNotExist, "Resource Not Found", status.HTTP_404_NOT_FOUND, None),
+    (Http404, "Resource Not Found", status.HTTP_404_NOT_FOUND, None),
+    (NotFound, "Resource Not Found", status.HTTP_404_NOT_FOUND, None),
+    (
+        MultipleObjectsReturned,
+        "Multiple objects found when one was expected",
+        status.HTTP_409_CONFLICT,
+        None,
+    ),
+    (PermissionError, "Permission Error", status.HTTP_403_FORBIDDEN, None),
+    (TimeoutError, "Request Timeout", status.HTTP_504_GATEWAY_TIMEOUT, None),
+    (ConnectionError, "Connection Error", status.HTTP_503_SERVICE_UNAVAILABLE, None),
+    (ValueError, "Invalid Value", status.HTTP_500_INTERNAL_SERVER_ERROR, str),
+    (TypeError, "Type Error", status.HTTP_500_INTERNAL_SERVER_ERROR, str),
+    (KeyError, "Key Error", status.HTTP_500_INTERNAL_SERVER_ERROR, _missing_key),
+    (IndexError, "Index Error", status.HTTP_500_INTERNAL_SERVER_ERROR, str),
+    (AttributeError, "Attribute Error", status.HTTP_500_INTERNAL_SERVER_ERROR, str),
+    # Django specific
+    (django.db.IntegrityError, "Database Integrity Error", status.HTTP_409_CONFLICT, str),
+    (
+        django.db.utils.OperationalError,
+        "Database Operational Error",
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        str,
+    ),
+    (django.db.DatabaseError, "Database Error", status.HTTP_500_INTERNAL_SERVER_ERROR, str),
+    # DRF specific
+    (
+        rest_framework.exceptions.AuthenticationFailed,
+        "Authentication Failed",
+        status.HTTP_401_UNAUTHORIZED,
+        _detail,
+    ),
+    (
+        rest_framework.exceptions.MethodNotAllowed,
+        "Method Not Allowed",
+        status.HTTP_405_METHOD_NOT_ALLOWED,
+        _detail,
+    ),
+    (
+        rest_framework.exceptions.Throttled,
+        "Request Throttled",
+        status.HTTP_429_TOO_MANY_REQUESTS,
+        _detail,
+    ),
+)
+
+def build_exception_dispatcher(table):
+    '''
+    Generates a dispatcher function with the isinstance checks of `table`
+    unrolled into a straight if-chain, so no table iteration happens per exception.
+    The generated function returns an error response, or None when no row matches.
+    '''
+    namespace = {}
+    lines = ["def _dispatch(self, exc, message):"]
+    for index, (exc_class, default_message, status_code, get_errors) in enumerate(table):
+        namespace[f"_class{index}"] = exc_class
+        namespace[f"_message{index}"] = default_message
+        namespace[f"_errors{index}"] = get_errors
+        errors = "None" if get_errors is None else f"_errors{index}(exc)"
+        lines.append(f"    if isinstance(exc, _class{index}):")
+        lines.append(
+            f"        return self.error_response("
+            f"message=_message{index} if message is None else message, "
+            f"errors={errors}, status_code={int(status_code)})"
+        )
+    lines.append("    return None")
+    exec(compile("\n".join(lines), "<exception_dispatch>", "exec"), namespace)
+    return namespace["_dispatch"]
+
+
+def _related_lookups(serializer, model, prefix=""):
+    '''
+    Walks the serializer fields and returns (select, prefetch) lookups
+    for the model relations the serializer will read.
+    FK / OneToOne sources go to select, M2M / reverse FK sources go to prefetch.
+    Nested serializers are followed with "__" joined lookups.
+    '''
+    select, prefetch = [], []
+    for field in serializer.fields.values():
+        if field.write_only or not field.source or field.source == "*":
+            continue
+        parts = field.source.split(".")
+        if (
+            len(parts) == 1
+            and isinstance(field, RelatedField)
+            and field.use_pk_only_optimization()
+        ):
+            continue  # reads <fk>_id, no query needed
+
+        current_model, path, many = model, [], False
+        for part in parts:
+            try:
+                model_field = current_model._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation or model_field.related_model is None:
+                break
+            path.append(part)
+            many = many or model_field.many_to_many or model_field.one_to_many
+            current_model = model_field.related_model
+        if not path:
+            continue
+
+        lookup = prefix + "__".join(path)
+        (prefetch if many else select).append(lookup)
+
+        nested = getattr(field, "child", field)
+        if len(path) == len(parts) and isinstance(nested, serializers.BaseSerializer):
+            nested_select, nested_prefetch = _related_lookups(
+                nested, current_model, prefix=lookup + "__"
+            )
+            if many:
+                prefetch.extend(nested_select + nested_prefetch)
+            else:
+                select.extend(nested_select)
+                prefetch.extend(nested_prefetch)
+    return select, prefetch
 
 
 class ResponseHandlerMixin:
@@ -29,10 +165,61 @@ class ResponseHandlerMixin:
         under paginated_response the user permissions for the model are also added to each item in the response
     """
 
+    # Largest result paginated_response returns without a paginator
+    max_unpaginated = getattr(settings, "MAX_UNPAGINATED_RESULTS", 1000)
+
+    # Send the user's available actions once under meta["actions"]
+    # instead of repeating them on every item.
+    actions_in_meta = False
+
+    # (serializer_class, model, fields, exclude) -> (select, prefetch)
+    _related_lookup_cache = {}
+
+    # Subclasses may override exception_table, the dispatcher is regenerated for them
+    exception_table = EXCEPTION_TABLE
+    _dispatch = build_exception_dispatcher(EXCEPTION_TABLE)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "exception_table" in cls.__dict__:
+            cls._dispatch = build_exception_dispatcher(cls.exception_table)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.permission_utils = None
 
+    def optimize_queryset(self, queryset, serializer_class, context=None, fields=None, exclude=None):
+        '''
+        Applies select_related / prefetch_related for the relations used by
+        serializer_class so serializing a page does not trigger N+1 queries.
+        The introspection result is cached per serializer class and field set.
+        '''
+        if not hasattr(queryset, "select_related"):
+            return queryset
+
+        model = queryset.model
+        key = (
+            serializer_class,
+            model,
+            tuple(fields) if fields else None,
+            tuple(exclude) if exclude else None,
+        )
+        lookups = self._related_lookup_cache.get(key)
+        if lookups is None:
+            try:
+                serializer = serializer_class(context=context, fields=fields, exclude=exclude)
+            except TypeError:
+                serializer = serializer_class(context=context)
+            lookups = _related_lookups(serializer, model)
+            self._related_lookup_cache[key] = lookups
+
+        select, prefetch = lookups
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
     def success_response(
         self,
         data=None,
@@ -63,121 +250,47 @@ class ResponseHandlerMixin:
 
     def exception_response(self, exc, message=None):
         """Handle common exceptions with appropriate responses."""
-        exception_handlers = {
-            ValidationError: lambda error: self.error_response(
-                message="Validation Error" if message is None else message,
-                errors=error.detail,
-                status_code=status.HTTP_400_BAD_REQUEST,
-            ),
-            serializers.ValidationError: lambda error: self.error_response(
-                message="Validation Error" if message is None else message,
-                errors=error.detail,
-                status_code=status.HTTP_400_BAD_REQUEST,
-            ),
-            PermissionDenied: lambda error: self.error_response(
-                message="Permission Denied" if message is None else message,
-                status_code=status.HTTP_403_FORBIDDEN,
-            ),
-            ObjectDoesNotExist: lambda error: self.error_response(
-                message="Resource Not Found" if message is None else message,
-                status_code=status.HTTP_404_NOT_FOUND,
-            ),
-            Http404: lambda error: self.error_response(
-                message="Resource Not Found" if message is None else message,
-                status_code=status.HTTP_404_NOT_FOUND,
-            ),
-            NotFound: lambda error: self.error_response(
-                message="Resource Not Found" if message is None else message,
-                status_code=status.HTTP_404_NOT_FOUND,
-            ),
-            MultipleObjectsReturned: lambda error: self.error_response(
-                message=(
-                    "Multiple objects found when one was expected"
-                    if message is None
-                    else message
-                ),
-                status_code=status.HTTP_409_CONFLICT,
-            ),
-            PermissionError: lambda error: self.error_response(
-                message="Permission Error" if message is None else message,
-                status_code=status.HTTP_403_FORBIDDEN,
-            ),
-            TimeoutError: lambda error: self.error_response(
-                message="Request Timeout" if message is None else message,
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            ),
-            ConnectionError: lambda error: self.error_response(
-                message="Connection Error" if message is None else message,
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            ),
-            ValueError: lambda error: self.error_response(
-                message="Invalid Value" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            TypeError: lambda error: self.error_response(
-                message="Type Error" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            KeyError: lambda error: self.error_response(
-                message="Key Error" if message is None else message,
-                errors=f"Missing key: {error}",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            IndexError: lambda error: self.error_response(
-                message="Index Error" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            AttributeError: lambda error: self.error_response(
-                message="Attribute Error" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            # Django specific
-            django.db.IntegrityError: lambda error: self.error_response(
-                message="Database Integrity Error" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_409_CONFLICT,
-            ),
-            django.db.DatabaseError: lambda error: self.error_response(
-                message="Database Error" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            django.db.utils.OperationalError: lambda error: self.error_response(
-                message="Database Operational Error" if message is None else message,
-                errors=str(error),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            ),
-            # DRF specific
-            rest_framework.exceptions.AuthenticationFailed: lambda error: self.error_response(
-                message="Authentication Failed" if message is None else message,
-                errors=error.detail,
-                status_code=status.HTTP_401_UNAUTHORIZED,
-            ),
-            rest_framework.exceptions.MethodNotAllowed: lambda error: self.error_response(
-                message="Method Not Allowed" if message is None else message,
-                errors=error.detail,
-                status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-            ),
-            rest_framework.exceptions.Throttled: lambda error: self.error_response(
-                message="Request Throttled" if message is None else message,
-                errors=error.detail,
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            ),
-        }
-
-        handler = exception_handlers.get(type(exc))
-        if handler:
-            return handler(exc)
+        response = self._dispatch(exc, message)
+        if response is not None:
+            return response
 
         return self.error_response(
             message=f"Internal Server Error: {exc}" if message is None else message,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+    def get_available_actions(self, model):
+        '''
+        Returns the user's available actions on the model, computed once per view instance.
+        '''
+        actions = getattr(self, "available_actions", None)
+        if actions is None:
+            actions = getattr(self, "_cached_actions", None)
+        if actions is None:
+            if getattr(self, "permission_utils", None) is None:
+                user = self.request.user
+                if model is None:
+                    # Plain lists carry no model, take the request's or the view's
+                    shared = getattr(self.request, "_perm_utils", None)
+                    if shared is not None:
+                        model = shared.model
+                    elif user.is_authenticated and not user.is_superuser:
+                        model = resolve_view_model(self)
+                self.permission_utils = get_request_permission_utils(self.request, model, view=self)
+            actions = self.permission_utils.user_available_actions()
+            self._cached_actions = actions
+        return actions
+
+    def attach_actions(self, items, model):
+        '''
+        Adds the available actions to each serialized item in place.
+        All items share the same actions list.
+        '''
+        actions = self.get_available_actions(model)
+        for item in items:
+            item["actions"] = actions
+        return items
+
     def paginated_response(
         self,
         paginator,
@@ -189,11 +302,15 @@ class ResponseHandlerMixin:
         fields=None,
         exclude=None,
     ):
-        self.permission_utils = PermissionUtils(self.request.user, self.__class__.__name__)
         """Handle paginated responses consistently using CustomPagination."""
+        # Plain lists are accepted too, they have no model
+        model = getattr(queryset, "model", None)
         try:
             context = context or self.get_serializer_context()
             if page is None:
+                queryset = self.optimize_queryset(
+                    queryset, serializer_class, context=context, fields=fields, exclude=exclude
+                )
                 page = paginator.paginate_queryset(queryset, self.request, view=self)
             if page is not None:
                 try:
@@ -202,30 +319,36 @@ class ResponseHandlerMixin:
                     )
                 except TypeError:
                     serializer = serializer_class(page, many=True, context=context)
-                actions = getattr(
-                    self, "available_actions", self.permission_utils.user_available_actions()
-                )
-                response_data = (
-                    [{**item, "actions": actions} for item in serializer.data]
-                    if data is None
-                    else data
-                )
+                if data is not None:
+                    response_data = data
+                elif self.actions_in_meta:
+                    response_data = serializer.data
+                else:
+                    response_data = self.attach_actions(serializer.data, model)
                 paginated_response = paginator.get_paginated_response(response_data)
+                meta = paginated_response.data["meta"]
+                if data is None and self.actions_in_meta:
+                    meta["actions"] = self.get_available_actions(model)
                 return self.success_response(
                     data=paginated_response.data["data"],
                     message="Success",
-                    meta=paginated_response.data["meta"],
+                    meta=meta,
+                )
+            # Fetch one row past the cap instead of a separate COUNT(*)
+            queryset = self.optimize_queryset(queryset, serializer_class, context=context)
+            rows = list(queryset[: self.max_unpaginated + 1])
+            if len(rows) > self.max_unpaginated:
+                return self.error_response(
+                    message="Please use pagination for large datasets",
+                    status_code=status.HTTP_400_BAD_REQUEST,
                 )
-            # if queryset.count() > 1000:
-            #     return self.error_response(
-            #         message="Please use pagination for large datasets",
-            #         status_code=status.HTTP_400_BAD_REQUEST,
-            #     )
-            serializer = serializer_class(queryset, many=True, context=context)
-            actions = getattr(
-                    self, "available_actions", self.permission_utils.user_available_actions()
+            serializer = serializer_class(rows, many=True, context=context)
+            if self.actions_in_meta:
+                return self.success_response(
+                    data=serializer.data,
+                    meta={"actions": self.get_available_actions(model)},
                 )
-            response_data = [{**item, "actions": actions} for item in serializer.data]
+            response_data = self.attach_actions(serializer.data, model)
             return self.success_response(data=response_data)
         except Exception as exc:
             return self.exception_response(exc)
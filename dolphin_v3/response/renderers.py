@@ -0,0 +1,34 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    # int dict keys (e.g. ListField errors keyed by index) are allowed, and
+    # datetimes go through DRF's encoder like with JSONRenderer
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class OrjsonRenderer(JSONRenderer):
+    '''
+    JSONRenderer backed by orjson (C implementation, several times faster than json).
+    Falls back to the default JSONRenderer when orjson is not installed
+    or when an indented response is requested (browsable API).
+
+    Usage (settings.py):
+        REST_FRAMEWORK = {
+            "DEFAULT_RENDERER_CLASSES": [
+                "dolphin_v3.response.renderers.OrjsonRenderer",
+                "rest_framework.renderers.BrowsableAPIRenderer",
+            ],
+        }
+    '''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder_class().default, option=_ORJSON_OPTIONS)
@@ -1,21 +1,52 @@
+import copy
+
 from rest_framework import serializers
 
 class DynamicFieldsModelSerializer(serializers.ModelSerializer):
     """
-    A ModelSerializer that takes an additional `fields` argument that
-    controls which fields should be displayed.
+    A ModelSerializer that takes additional `fields` and `exclude` arguments that
+    control which fields should be displayed.
+
+    The resolved fields are built once per (serializer class, fields, exclude)
+    and deep-copied for every new instance, skipping ModelSerializer's model
+    introspection. Set `cache_fields = False` on subclasses whose get_fields()
+    depends on the request / context.
     """
+    cache_fields = True
+    # (serializer class, fields, exclude) -> unbound fields
+    _fields_cache = {}
 
     def __init__(self, *args, **kwargs):
         # Instantiate the superclass normally
         fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        self._fields_key = (
+            type(self),
+            tuple(fields) if fields else None,
+            tuple(exclude) if exclude else None,
+        )
         super(DynamicFieldsModelSerializer, self).__init__(*args, **kwargs)
+
+    def get_fields(self):
+        if self.cache_fields:
+            cached = self._fields_cache.get(self._fields_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+        _, fields, exclude = self._fields_key
+        all_fields = super().get_fields()
         if fields:
             # Drop any fields that are not specified in the `fields` argument.
             allowed = set(fields)
-            existing = set(self.fields.keys())
-            for field_name in existing - allowed:
-                self.fields.pop(field_name)
+            for field_name in set(all_fields) - allowed:
+                all_fields.pop(field_name)
+        if exclude:
+            for field_name in exclude:
+                all_fields.pop(field_name, None)
+
+        if self.cache_fields:
+            self._fields_cache[self._fields_key] = copy.deepcopy(all_fields)
+        return all_fields
 
 
 class BaseAuditSerializer(serializers.ModelSerializer):
@@ -1,15 +1,110 @@
-from collections import defaultdict
+import json
+import time
+from types import MappingProxyType
+from itertools import groupby
+from operator import itemgetter
 from dolphin_v3.cache.redis_cache import get_redis_client
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import  Group, Permission
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 
 from django.urls import resolve
 from rest_framework.permissions import BasePermission
 from django.core.exceptions import ImproperlyConfigured
 from rest_framework.exceptions import PermissionDenied
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.core.exceptions import ValidationError
 
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _dumps(value):
+    '''Serialize cached values once to JSON bytes (orjson when installed).'''
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+_redis_default = None
+
+
+def _redis():
+    '''The "default" RedisClient, resolved once per process.'''
+    global _redis_default
+    if _redis_default is None:
+        _redis_default = get_redis_client("default")
+    return _redis_default
+
+
+# HTTP method -> permission action, and permission action -> view action
+_METHOD_ACTION = MappingProxyType({
+    "GET": "view",
+    "POST": "add",
+    "PUT": "change",
+    "PATCH": "change",
+    "DELETE": "delete",
+})
+_ACTION_VIEWS = MappingProxyType({
+    'view': 'list',
+    'add': 'create',
+    'change': 'update',
+    'delete': 'delete',
+})
+_ACTIONS = frozenset(_ACTION_VIEWS)
+
+
+# Process-local copy of get_all_permissions() in front of Redis,
+# cleared by the permission signal handlers below.
+_LOCAL_PERMS_TTL = 30
+_LOCAL_PERMS = {"data": None, "expires_at": 0}
+
+
+def _set_local_permissions(data):
+    _LOCAL_PERMS["data"] = data
+    _LOCAL_PERMS["expires_at"] = time.monotonic() + _LOCAL_PERMS_TTL
+    return data
+
+
+def prefetch_user_permissions(user):
+    '''
+    Prefetch the user's groups and their permissions in 2 queries,
+    PermissionUtils instances for this user then read them from memory.
+    '''
+    prefetch_related_objects([user], "groups__permissions")
+
+
+def resolve_view_model(view):
+    '''
+    Returns the model of the view's queryset, memoized on the view instance.
+    The class level `queryset` is preferred since reading its .model doesn't run
+    any get_queryset() filtering / annotation code.
+    '''
+    model = getattr(view, "_perm_model", None)
+    if model is not None:
+        return model
+    if getattr(view, "queryset", None) is not None:
+        model = view.queryset.model
+    elif hasattr(view, "get_queryset"):
+        model = view.get_queryset().model
+    else:
+        raise ImproperlyConfigured("CustomPermissionClass requires a queryset on the view.")
+    view._perm_model = model
+    return model
+
+
 class PermissionUtils:
     '''
     Utility class for handling user permissions based on groups and caching.
@@ -32,141 +127,211 @@ class PermissionUtils:
         self.model = model
         self.view = view
         self.request = request
-        self.actions = {
-            'view': 'list',
-            'add': 'create',
-            'change': 'update',
-            'delete': 'delete'
-        }
-    
+        self.actions = _ACTION_VIEWS
+        # Resolved once, used by every permission check and cache key below
+        self._model_name = model._meta.model_name if model is not None else None
+        self._cache_key_prefix = f"user_perm:{user.id if user else 'anon'}:{self._model_name}"
+        # (content_type_id, codename) pairs of the user, see get_user_permission_codenames()
+        self._perm_pairs = None
+        self._perm_set = None
+        self._all_perms = None
+        self._model_perms = None
+
+    def get_user_permission_codenames(self):
+        '''
+        Load all permission codenames of the user (through groups) on first use, with
+        a single query, or from memory if prefetch_user_permissions() already ran.
+        The result is kept on the instance and reused by has_permission,
+        user_available_actions, get_user_all_permissions and get_user_model_permissions.
+        :return: frozenset of permission codenames
+        '''
+        if self._perm_set is None:
+            if self._is_anonymous():
+                # AnonymousUser has no groups, and no pk to filter on
+                self._perm_pairs = frozenset()
+            elif self._has_prefetched_permissions():
+                # Read from the prefetch cache, note .filter() would bypass it
+                self._perm_pairs = frozenset(
+                    (permission.content_type_id, permission.codename)
+                    for group in self.user.groups.all()
+                    for permission in group.permissions.all()
+                )
+            else:
+                self._perm_pairs = frozenset(
+                    Permission.objects.filter(group__user=self.user).values_list(
+                        'content_type_id', 'codename'
+                    )
+                )
+            self._perm_set = frozenset(codename for _, codename in self._perm_pairs)
+        return self._perm_set
+
+    def _is_anonymous(self):
+        return self.user is None or not self.user.is_authenticated
+
+    def _has_prefetched_permissions(self):
+        return "groups" in getattr(self.user, "_prefetched_objects_cache", {})
+
     def has_permission(self, action):
         '''
         Check if the user has the required permission for the given action on the model.
-        Uses cache to reduce DB queries.
+        Uses the loaded permission set when available, otherwise cache to reduce DB queries.
 
         :param action: 'view', 'add', 'change', 'delete'
         :return: Boolean
         '''
-        if action not in self.actions.keys():
-            raise ValueError(f"Invalid action: {action}. Valid actions are: {list(self.actions.keys())}")
+        return self.has_permissions_bulk([action])[action]
+
+    def has_permissions_bulk(self, actions):
+        '''
+        Check several actions at once: one Redis MGET for all of them and a single
+        query for the ones missing from cache. Negative results are cached too.
+
+        :param actions: list of 'view', 'add', 'change', 'delete'
+        :return: dict of action -> Boolean
+        '''
+        for action in actions:
+            if action not in _ACTIONS:
+                raise ValueError(f"Invalid action: {action}. Valid actions are: {sorted(_ACTIONS)}")
+
+        # Anonymous users never have model permissions, nothing is cached for them
+        if self._is_anonymous():
+            return dict.fromkeys(actions, False)
 
         # Superuser always has permission
         if self.user.is_superuser:
-            return True
+            return dict.fromkeys(actions, True)
 
-        # Create a cache key based on user id, model name, and action
-        cache_key = f"user_perm:{self.user.id}:{self.model._meta.model_name.lower()}:{action}"
+        model_name = self._model_name
+        if self._perm_set is not None or self._has_prefetched_permissions():
+            permissions = self.get_user_permission_codenames()
+            return {action: f'{action}_{model_name}' in permissions for action in actions}
 
+        # Cache keys based on user id, model name, and action
+        cache_keys = [f"{self._cache_key_prefix}:{action}" for action in actions]
         try:
-        # Try to get cached result
-            cached_result = get_redis_client("default").get(cache_key)
-        except Exception as e:
-            cached_result = None
-            
-        # cached_result = cache.get(cache_key)
-        if cached_result is not None:
-            return cached_result
-
-        # Check group permissions
-        user_groups = self.user.groups.all()
-        required_permission = f'{action}_{self.model._meta.model_name}'
-        has_perm = False
-        for group in user_groups:
-            if group.permissions.filter(codename=required_permission).exists():
-                has_perm = True
-                break
-        try:
-            # Cache the result for future use
-            get_redis_client("default").set(cache_key, has_perm, ttl=300)  # 300 seconds = 5 minutes
+            cached_results = _redis().mget(cache_keys)
         except Exception as e:
-            pass
-        
-        return has_perm
+            cached_results = [None] * len(actions)
+
+        result = {}
+        missing = []
+        for action, cached_result in zip(actions, cached_results):
+            if cached_result is None:
+                missing.append(action)
+            else:
+                result[action] = cached_result in (b"1", "1")
+
+        if missing:
+            # Check group permissions of all missing actions with a single JOIN query
+            granted = set(
+                Permission.objects.filter(
+                    group__user=self.user,
+                    codename__in=[f'{action}_{model_name}' for action in missing],
+                ).values_list('codename', flat=True)
+            )
+            to_cache = {}
+            for action in missing:
+                result[action] = f'{action}_{model_name}' in granted
+                to_cache[f"{self._cache_key_prefix}:{action}"] = "1" if result[action] else "0"
+            # Index the keys per user so signal handlers can invalidate them
+            index_key = f"perm_index:user:{self.user.id}"
+            try:
+                # Cache the results for future use
+                with _redis().pipeline(transaction=False) as pipe:
+                    for cache_key, value in to_cache.items():
+                        pipe.set(cache_key, value, ex=300)  # 300 seconds = 5 minutes
+                    pipe.sadd(index_key, *to_cache)
+                    pipe.expire(index_key, 300)
+                    pipe.execute()
+            except Exception as e:
+                pass
+
+        return result
     
     def get_user_all_permissions(self):
         '''
         Get all permissions for the given user.
         :param user: User instance
-        :return: Set of permission codenames
+        :return: frozenset of permission codenames
         '''
-        if self.user.is_superuser:
-            return set(Permission.objects.values_list('codename', flat=True))
-        
-        user_groups = self.user.groups.all()
-        permissions = set()
-        for group in user_groups:
-            group_permissions = group.permissions.values_list('codename', flat=True)
-            permissions.update(group_permissions)
-        return permissions
+        if self._all_perms is None:
+            if self.user.is_superuser:
+                self._all_perms = frozenset(Permission.objects.values_list('codename', flat=True))
+            else:
+                self._all_perms = self.get_user_permission_codenames()
+        return self._all_perms
     
     def user_available_actions(self):
         '''
         Get all available actions for the user on the model.
         :return: List of actions
         '''
-        available_actions = []
-        for action in self.actions.keys():
-            if self.has_permission(action):
-                available_actions.append(action)
-        return available_actions
+        permissions = self.has_permissions_bulk(list(_ACTION_VIEWS))
+        return [action for action, allowed in permissions.items() if allowed]
 
     def get_user_model_permissions(self):
         '''
         Get all permissions for the user related to the model.
-        :return: Set of permission codenames
+        :return: frozenset of permission codenames
         '''
+        if self._model_perms is not None:
+            return self._model_perms
+
+        # get_for_model is cached per process, filtering by id avoids the content type JOIN.
+        # Proxy models have their own content type and permissions
+        content_type_id = ContentType.objects.get_for_model(self.model, for_concrete_model=False).id
         if self.user.is_superuser:
-            return set(Permission.objects.filter(content_type__model=self.model._meta.model_name).values_list('codename', flat=True))
-        
-        user_groups = self.user.groups.all()
-        permissions = set()
-        for group in user_groups:
-            group_permissions = group.permissions.filter(content_type__model=self.model._meta.model_name).values_list('codename', flat=True)
-            permissions.update(group_permissions)
-        return permissions
+            self._model_perms = frozenset(
+                Permission.objects.filter(content_type_id=content_type_id).values_list('codename', flat=True)
+            )
+        else:
+            self.get_user_permission_codenames()
+            self._model_perms = frozenset(
+                codename for ct_id, codename in self._perm_pairs if ct_id == content_type_id
+            )
+        return self._model_perms
     
     @staticmethod
     def get_all_permissions():
         '''
         Get all permissions grouped by model name.
-        :return: dict
+        Served from process memory for up to 30 seconds, then Redis, then the DB.
+        :return: dict (shared, don't mutate)
         '''
-        if get_redis_client("default") is not None:
-            cache_key = "all_permissions_dict"
-            try:
-                cached_permissions = get_redis_client("default").get(cache_key)
-                if cached_permissions is not None:
-                    return cached_permissions
-            except Exception as e:
-                pass
+        if time.monotonic() < _LOCAL_PERMS["expires_at"]:
+            return _LOCAL_PERMS["data"]
+
+        client = _redis()
+        cache_key = "all_permissions_dict"
+        try:
+            cached_permissions = client.get(cache_key)
+            if cached_permissions is not None:
+                return _set_local_permissions(_loads(cached_permissions))
+        except Exception as e:
+            pass
 
-        permissions = Permission.objects.select_related(
-            "content_type"
-        ).values(
+        permissions = Permission.objects.order_by(
+            "content_type__model", "id"
+        ).values_list(
+            "content_type__model",
             "id",
             "name",
             "codename",
-            "content_type__model",
         )
 
-        result = defaultdict(list)
-
-        for perm in permissions:
-            model_name = perm["content_type__model"]
-
-            result[model_name].append({
-                "id": perm["id"],
-                "name": perm["name"],
-                "code": perm["codename"],
-            })
-        cache_key = "all_permissions_dict"
+        result = {
+            model_name: [
+                {"id": perm_id, "name": name, "code": codename}
+                for _, perm_id, name, codename in rows
+            ]
+            for model_name, rows in groupby(permissions, key=itemgetter(0))
+        }
         try:
-            get_redis_client("default").set(cache_key, dict(result), ttl=3600)  # Cache for 1 hour
+            client.set(cache_key, _dumps(result), ttl=3600)  # Cache for 1 hour
         except Exception as e:
             pass
 
-
-        return dict(result)
+        return _set_local_permissions(result)
     
     @staticmethod
     def get_all_groups():
@@ -174,14 +339,14 @@ class PermissionUtils:
         Get all groups with their permissions.
         :return: dict
         '''
-        if get_redis_client("default") is not None:
-            cache_key = "all_groups_dict"
-            try:
-                cached_groups = get_redis_client("default").get(cache_key)
-                if cached_groups is not None:
-                    return cached_groups
-            except Exception as e:
-                pass
+        client = _redis()
+        cache_key = "all_groups_dict"
+        try:
+            cached_groups = client.get(cache_key)
+            if cached_groups is not None:
+                return _loads(cached_groups)
+        except Exception as e:
+            pass
 
         groups = Group.objects.prefetch_related("permissions").all()
 
@@ -212,9 +377,8 @@ class PermissionUtils:
                 "permissions": perm_list,
             })
         
-        cache_key = "all_groups_dict"
         try:
-            get_redis_client("default").set(cache_key, result, ttl=3600)  # Cache for 1 hour
+            client.set(cache_key, _dumps(result), ttl=3600)  # Cache for 1 hour
         except Exception as e:
             pass
 
@@ -278,6 +442,19 @@ class PermissionUtils:
         except Group.DoesNotExist:
             raise ValueError(f"Group '{group_id}' does not exist.")
     
+def get_request_permission_utils(request, model, view=None):
+    '''
+    Returns the request's PermissionUtils for model, created and attached as
+    request._perm_utils on first use so the permission classes, the view and
+    paginated_response share one instance (and its loaded permissions).
+    '''
+    permission_utils = getattr(request, "_perm_utils", None)
+    if permission_utils is None or permission_utils.model is not model:
+        permission_utils = PermissionUtils(user=request.user, model=model, view=view, request=request)
+        request._perm_utils = permission_utils
+    return permission_utils
+
+
 class CustomPermissionClass(BasePermission):
     '''
     Custom permission class to check user permissions based on action and model.
@@ -292,45 +469,26 @@ class CustomPermissionClass(BasePermission):
           }
     '''
     def has_permission(self, request, view):
-        try:
-            method_action = {
-                "GET": "view",
-                "POST": "add",
-                "PUT": "change",
-                "PATCH": "change",
-                "DELETE": "delete",
-            }
-            if not request.user or isinstance(request.user, AnonymousUser):
-                return False
-            if request.method in ["OPTIONS", "HEAD"]:
-                return True
-            user = request.user
-            if user.is_superuser:
-                return True
-            if hasattr(view, "get_queryset"):
-                model = view.get_queryset().model
-            elif hasattr(view, "queryset") and view.queryset is not None:
-                model = view.queryset.model
-            else:
-                raise ImproperlyConfigured("CustomPermissionClass requires a queryset on the view.")
-            
-            permission_utils = PermissionUtils(user=user, model=model, view=view, request=request)
+        if not request.user or isinstance(request.user, AnonymousUser):
+            return False
+        if request.method in ["OPTIONS", "HEAD"]:
+            return True
+        user = request.user
+        if user.is_superuser:
+            return True
+        model = resolve_view_model(view)
 
-            # Map HTTP methods to action keys
-            action_key = method_action.get(request.method.upper())
+        permission_utils = get_request_permission_utils(request, model, view=view)
 
-            if not action_key:
-                return False
-            
-            has_module_permission = permission_utils.has_permission(action_key)
+        # Map HTTP methods to action keys
+        action_key = _METHOD_ACTION.get(request.method.upper())
 
-            return bool(has_module_permission)
+        if not action_key:
+            return False
         
-        except ImproperlyConfigured as e:
-            raise e
-        except Exception as e:
-            raise e
-            # return False
+        has_module_permission = permission_utils.has_permission(action_key)
+
+        return bool(has_module_permission)
 
 class IsSuperUser(BasePermission):
     '''
@@ -341,4 +499,97 @@ class IsSuperUser(BasePermission):
     def has_permission(self, request, view):
         if not request.user or isinstance(request.user, AnonymousUser):
             return False
-        return request.user.is_superuser
\ No newline at end of file
+        return request.user.is_superuser
+
+
+def invalidate_user_permissions(user_ids):
+    '''
+    Delete the cached per-user permission results of the given users.
+    The keys are found through the perm_index:user:<id> set filled by has_permissions_bulk.
+    '''
+    index_keys = [f"perm_index:user:{user_id}" for user_id in set(user_ids)]
+    if not index_keys:
+        return
+    try:
+        client = _redis()
+        with client.pipeline(transaction=False) as pipe:
+            for index_key in index_keys:
+                pipe.smembers(index_key)
+            members = pipe.execute()
+        cache_keys = [key for keys in members for key in keys]
+        client.conn.delete(*cache_keys, *index_keys)
+    except Exception as e:
+        pass
+
+
+def _delete_cache_keys(*cache_keys):
+    try:
+        _redis().conn.delete(*cache_keys)
+    except Exception as e:
+        pass
+
+
+def _after_commit(func, *args):
+    '''
+    Runs func(*args) once the current transaction commits (right away outside of
+    one), so a request between the invalidation and the COMMIT can't re-cache the
+    old rows. Arguments must already be resolved, not lazy querysets.
+    '''
+    transaction.on_commit(lambda: func(*args))
+
+
+def _clear_all_permissions():
+    _LOCAL_PERMS["expires_at"] = 0
+    _delete_cache_keys("all_permissions_dict", "all_groups_dict")
+
+
+# m2m_changed actions to invalidate on, keyed by `reverse`. A reverse clear()
+# has no pk_set, so the affected rows are resolved in pre_clear.
+_M2M_INVALIDATE_ACTIONS = {
+    False: ("post_add", "post_remove", "post_clear"),
+    True: ("post_add", "post_remove", "pre_clear"),
+}
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in _M2M_INVALIDATE_ACTIONS[reverse]:
+        return
+    if not reverse:
+        group_ids = [instance.pk]
+    elif pk_set is not None:
+        group_ids = pk_set
+    else:  # permission.group_set.clear(), groups are looked up before they're cleared
+        group_ids = list(instance.group_set.values_list("pk", flat=True))
+    user_ids = list(
+        get_user_model().objects.filter(groups__in=group_ids).values_list("pk", flat=True)
+    )
+    _after_commit(invalidate_user_permissions, user_ids)
+    _after_commit(_delete_cache_keys, "all_groups_dict")
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in _M2M_INVALIDATE_ACTIONS[reverse]:
+        return
+    if not reverse:
+        user_ids = [instance.pk]
+    elif pk_set is not None:
+        user_ids = pk_set
+    else:  # group.user_set.clear(), users are looked up before they're cleared
+        user_ids = list(instance.user_set.values_list("pk", flat=True))
+    _after_commit(invalidate_user_permissions, list(user_ids))
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permission_changed(sender, **kwargs):
+    _after_commit(_clear_all_permissions)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # Deleting a group removes its m2m rows without m2m_changed
+    user_ids = list(instance.user_set.values_list("pk", flat=True))
+    _after_commit(invalidate_user_permissions, user_ids)
+    _after_commit(_delete_cache_keys, "all_groups_dict")
@@ -1,19 +1,19 @@
-from django.core.exceptions import ObjectDoesNotExist
-from django.http import Http404
 from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views.decorators.csrf import csrf_protect
 
 from rest_framework import status, viewsets
-from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 
 from dolphin_v3.response.mixins import  ResponseHandlerMixin
-from dolphin_v3.users.permissions import PermissionUtils
+from dolphin_v3.users.permissions import (
+    get_request_permission_utils,
+    resolve_view_model,
+)
 
 
 class AbstractViewSet(
     viewsets.ModelViewSet,
     ResponseHandlerMixin,
-    PermissionUtils,
 ):
     """Base ViewSet class with response handler mixin implemented.
 
@@ -34,25 +34,48 @@ class AbstractViewSet(
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Memoized on the view, shared with CustomPermissionClass
         self.model_name = getattr(
-            self, "model_name", self.get_queryset().model.__name__
+            self, "model_name", resolve_view_model(self).__name__
         )
         self.viewset_name = self.__class__.__name__
         self.permission_utils = None
 
     def initial(self, request, *args, **kwargs):
         request = self.request
-        self.permission_utils = PermissionUtils(request.user, self.get_queryset().model)
-        if request and hasattr(request, "user") and request.user.is_authenticated:
-            self.user_all_permissions = self.permission_utils.get_user_all_permissions()
-            self.available_actions = self.permission_utils.user_available_actions()
-            self.user_module_permissions = self.permission_utils.get_user_model_permissions()
+        # One PermissionUtils per request, shared with the permission classes.
+        # Nothing is loaded here, permissions are read on first use
+        self.permission_utils = get_request_permission_utils(
+            request, resolve_view_model(self), view=self
+        )
         return super().initial(request, *args, **kwargs)
 
+    # Computed on first access only, DRF creates a new view instance per request
+    @cached_property
+    def user_all_permissions(self):
+        if not self.request.user.is_authenticated:
+            return frozenset()
+        return self.permission_utils.get_user_all_permissions()
+
+    @cached_property
+    def available_actions(self):
+        if not self.request.user.is_authenticated:
+            return []
+        return self.permission_utils.user_available_actions()
+
+    @cached_property
+    def user_module_permissions(self):
+        if not self.request.user.is_authenticated:
+            return frozenset()
+        return self.permission_utils.get_user_model_permissions()
+
     def list(self, request, *args, **kwargs):
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            
+            queryset = self.optimize_queryset(
+                queryset, self.get_serializer_class(), context=self.get_serializer_context()
+            )
+
             if self.pagination_class:
                 page = self.paginate_queryset(queryset)
                 return self.paginated_response(
@@ -78,14 +101,6 @@ class AbstractViewSet(
                 data=serializer.data,
                 status_code=status.HTTP_201_CREATED,
             )
-        except (
-            ValidationError,
-            NotFound,
-            ObjectDoesNotExist,
-            PermissionDenied,
-            Http404,
-        ) as e:
-            return self.exception_response(e)
         except Exception as e:
             return self.exception_response(e)
 
@@ -97,14 +112,6 @@ class AbstractViewSet(
                 message=f"{self.model_name} retrieved successfully",
                 data=serializer.data,
             )
-        except (
-            ValidationError,
-            PermissionDenied,
-            ObjectDoesNotExist,
-            Http404,
-            NotFound,
-        ) as e:
-            return self.exception_response(e)
         except Exception as e:
             return self.exception_response(e)
 
@@ -126,14 +133,6 @@ class AbstractViewSet(
             return self.success_response(
                 message=f"{self.model_name} updated successfully", data=serializer.data
             )
-        except (
-            ObjectDoesNotExist,
-            Http404,
-            NotFound,
-            ValidationError,
-            PermissionDenied,
-        ) as e:
-            return self.exception_response(e)
         except Exception as e:
             return self.exception_response(e)
 
@@ -145,23 +144,15 @@ class AbstractViewSet(
                 instance.delete(user = request.user)
             elif hasattr(instance, "is_active"):
                 instance.is_active = False
+                instance.save()
             else:
                 return self.error_response(
                     message=f"{self.model_name} Couldnt be deleted"
                 )
-            instance.save()
             # self.perform_destroy(instance)
             return self.success_response(
                 message=f"{self.model_name} deleted successfully",
                 # status_code=status.HTTP_204_NO_CONTENT,
             )
-        except (
-            ObjectDoesNotExist,
-            Http404,
-            NotFound,
-            ValidationError,
-            PermissionDenied,
-        ) as e:
-            return self.exception_response(e)
         except Exception as e:
             return self.exception_response(e)
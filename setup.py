@@ -9,9 +9,14 @@ setup(
         "Django>=4.0",
         "djangorestframework",
         "pytz",
+        "tzdata",
         "django-redis",
         "redis",
+        "argon2-cffi",
     ],
+    extras_require={
+        "lz4": ["lz4"],
+    },
     description="Common reusable core for all Django modules",
     author="shree-dhimal",
     url="git@github.com:shree-dhimal/django-core-auth-setup.git",